@@ -0,0 +1,22 @@
+"""add composite user/trip index to trip_members
+
+Revision ID: 0003_add_trip_members_user_trip_index
+Revises: 0002_add_location_coords
+Create Date: 2026-10-15 12:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0003_add_trip_members_user_trip_index"
+down_revision = "0002_add_location_coords"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_trip_members_user_trip", "trip_members", ["user_id", "trip_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_members_user_trip", table_name="trip_members")
@@ -0,0 +1,24 @@
+"""add composite indexes for trip export queries
+
+Revision ID: 0004_add_export_composite_indexes
+Revises: 0003_add_trip_members_user_trip_index
+Create Date: 2026-10-15 12:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0004_add_export_composite_indexes"
+down_revision = "0003_add_trip_members_user_trip_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_expenses_trip_envelope", "expenses", ["trip_id", "envelope_id"])
+    op.create_index("ix_events_trip_date_start", "events", ["trip_id", "date", "start_time"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_trip_date_start", table_name="events")
+    op.drop_index("ix_expenses_trip_envelope", table_name="expenses")
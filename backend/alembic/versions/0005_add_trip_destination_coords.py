@@ -0,0 +1,27 @@
+"""add destination latitude longitude to trips
+
+Revision ID: 0005_add_trip_destination_coords
+Revises: 0004_add_export_composite_indexes
+Create Date: 2026-10-15 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_add_trip_destination_coords"
+down_revision = "0004_add_export_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.add_column(sa.Column("destination_latitude", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("destination_longitude", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("trips") as batch_op:
+        batch_op.drop_column("destination_longitude")
+        batch_op.drop_column("destination_latitude")
@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./trip_planner.db"
     secret_key: str = "change-me-in-production"
     access_token_expire_minutes: int = 60 * 24
+    debug: bool = False
 
     model_config = SettingsConfigDict(env_prefix="TRIP_PLANNER_", case_sensitive=False)
 
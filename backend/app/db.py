@@ -1,9 +1,13 @@
 """Database engine and session management."""
 
-from typing import Generator
+from functools import lru_cache
+from typing import Annotated, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import Depends
+
+from sqlalchemy import URL, create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from .config import get_settings
 
@@ -15,11 +19,62 @@ engine = create_engine(settings.database_url, connect_args=connect_args)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers used for the same database by endpoints that run on the event loop.
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _async_database_url(url: str) -> URL:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Create the async engine on first use so sync-only code paths never need an async driver."""
+    return create_async_engine(_async_database_url(settings.database_url))
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections, if the async engine was ever created."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+
 
 def get_db() -> Generator:
-    """Provide a SQLAlchemy session for FastAPI dependency injection."""
+    """Provide a SQLAlchemy session for FastAPI dependency injection.
+
+    Handlers only flush their changes; the transaction is committed during
+    dependency teardown and rolled back if the handler raised. Handlers should
+    take a ``DbSession`` rather than depending on this directly.
+    """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Provide an AsyncSession for async endpoints, mirroring get_db."""
+    async with get_async_sessionmaker()() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+# Function scope runs the commit teardown before the response is sent, so clients
+# never observe an uncommitted write. Always inject sessions through these aliases.
+DbSession = Annotated[Session, Depends(get_db, scope="function")]
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db, scope="function")]
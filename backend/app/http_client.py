@@ -0,0 +1,14 @@
+"""Shared outbound HTTP client management."""
+
+import httpx
+from fastapi import Request
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the pooled client reused by all outbound API calls."""
+    return httpx.AsyncClient(timeout=10, limits=httpx.Limits(max_keepalive_connections=20))
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Provide the application-wide HTTP client for FastAPI dependency injection."""
+    return request.app.state.http
@@ -1,12 +1,29 @@
 """FastAPI application entrypoint."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from .db import dispose_async_engine
+from .http_client import create_http_client
 from .routers import auth, budget, destinations, events, trips, weather
 from .schemas import HealthResponse
 
-app = FastAPI(title="Trip Itinerary Planner")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    app.state.http = create_http_client()
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        await dispose_async_engine()
+
+
+app = FastAPI(title="Trip Itinerary Planner", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
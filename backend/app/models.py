@@ -1,10 +1,16 @@
 """SQLAlchemy models for the trip planner domain."""
 
-from sqlalchemy import Column, Date, Float, ForeignKey, Integer, JSON, String, Text, Time
-from sqlalchemy.orm import declarative_base, relationship
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Date, Float, ForeignKey, Index, Integer, JSON, String, Text, Time, event
+from sqlalchemy.orm import declarative_base, object_session, relationship
+from sqlalchemy.orm.util import identity_key
 
 Base = declarative_base()
 
+# Instance-dict key for Trip.member_roles()'s memoized map.
+_MEMBER_ROLES_KEY = "_member_roles"
+
 
 class User(Base):
     __tablename__ = "users"
@@ -25,20 +31,39 @@ class Trip(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     destination = Column(String, nullable=False)
+    destination_latitude = Column(Float, nullable=True)
+    destination_longitude = Column(Float, nullable=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
     owner = relationship("User", back_populates="trips_owned")
     members = relationship("TripMember", back_populates="trip", cascade="all, delete-orphan")
     destinations = relationship("TripDestination", back_populates="trip", cascade="all, delete-orphan")
-    events = relationship("Event", back_populates="trip", cascade="all, delete-orphan")
+    events = relationship(
+        "Event", back_populates="trip", cascade="all, delete-orphan", order_by="(Event.date, Event.start_time)"
+    )
     budget_envelopes = relationship("BudgetEnvelope", back_populates="trip", cascade="all, delete-orphan")
     expenses = relationship("Expense", back_populates="trip", cascade="all, delete-orphan")
     weather_alerts = relationship("WeatherAlert", back_populates="trip", cascade="all, delete-orphan")
 
+    def member_roles(self) -> Dict[int, str]:
+        """Map each member's user id to their role, memoized until the members change."""
+        roles = self.__dict__.get(_MEMBER_ROLES_KEY)
+        if roles is None:
+            roles = {member.user_id: member.role for member in self.members}
+            self.__dict__[_MEMBER_ROLES_KEY] = roles
+        return roles
+
+    def role_for(self, user_id: int) -> Optional[str]:
+        """Return "owner", the user's member role, or None when they have no access."""
+        if self.owner_id == user_id:
+            return "owner"
+        return self.member_roles().get(user_id)
+
 
 class TripMember(Base):
     __tablename__ = "trip_members"
+    __table_args__ = (Index("ix_trip_members_user_trip", "user_id", "trip_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
@@ -49,6 +74,37 @@ class TripMember(Base):
     user = relationship("User", back_populates="memberships")
 
 
+def _reset_member_roles(trip: Trip) -> None:
+    trip.__dict__.pop(_MEMBER_ROLES_KEY, None)
+
+
+@event.listens_for(Trip.members, "append")
+@event.listens_for(Trip.members, "remove")
+def _trip_members_changed(target, value, initiator) -> None:
+    _reset_member_roles(target)
+
+
+@event.listens_for(Trip, "expire")
+def _trip_expired(target, attrs) -> None:
+    _reset_member_roles(target)
+
+
+@event.listens_for(Trip, "refresh")
+def _trip_refreshed(target, context, attrs) -> None:
+    _reset_member_roles(target)
+
+
+@event.listens_for(TripMember.role, "set")
+def _trip_member_role_changed(target, value, oldvalue, initiator) -> None:
+    # Only touch a trip already in the session; a lazy load here would defeat the point.
+    session = object_session(target)
+    if session is None or target.trip_id is None:
+        return
+    trip = session.identity_map.get(identity_key(Trip, target.trip_id))
+    if trip is not None:
+        _reset_member_roles(trip)
+
+
 class Location(Base):
     __tablename__ = "locations"
 
@@ -77,6 +133,7 @@ class TripDestination(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (Index("ix_events_trip_date_start", "trip_id", "date", "start_time"),)
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
@@ -108,6 +165,7 @@ class BudgetEnvelope(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (Index("ix_expenses_trip_envelope", "trip_id", "envelope_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
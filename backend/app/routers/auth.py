@@ -11,7 +11,7 @@ from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.db import get_db
+from app.db import DbSession
 from app.models import User
 from app.schemas import UserCreate, UserLogin, UserRead
 
@@ -52,7 +52,7 @@ def get_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
+def register_user(payload: UserCreate, db: DbSession) -> User:
     # Ensure email and username are unique.
     existing = db.query(User).filter(or_(User.email == payload.email, User.username == payload.username)).first()
     if existing:
@@ -61,13 +61,12 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
     hashed_password = get_password_hash(payload.password)
     user = User(email=payload.email, username=payload.username, password_hash=hashed_password)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
 @router.post("/login")
-def login(payload: UserLogin, db: Session = Depends(get_db)):
+def login(payload: UserLogin, db: DbSession):
     identifier = payload.email or payload.username
     if not identifier:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email or username is required.")
@@ -80,7 +79,7 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer", "user": UserRead.model_validate(user)}
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def get_current_user(db: DbSession, token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
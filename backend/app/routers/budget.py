@@ -6,9 +6,9 @@ from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
-from app.db import get_db
+from app.db import DbSession
 from app.models import BudgetEnvelope, Expense, Trip
 from app.routers.auth import get_current_user
 from app.schemas import BudgetEnvelopeCreate, BudgetEnvelopeRead, ExpenseCreate, ExpenseRead
@@ -17,21 +17,14 @@ router = APIRouter(tags=["budget"])
 
 
 def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = db.query(Trip).options(selectinload(Trip.members)).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
     return trip
 
 
-def _user_role_for_trip(trip: Trip, user_id: int):
-    if trip.owner_id == user_id:
-        return "owner"
-    membership = next((m for m in trip.members if m.user_id == user_id), None)
-    return membership.role if membership else None
-
-
 def _require_view_access(trip: Trip, user_id: int) -> str:
-    role = _user_role_for_trip(trip, user_id)
+    role = trip.role_for(user_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
     return role
@@ -61,7 +54,7 @@ class ExpenseUpdate(BaseModel):
 
 
 @router.get("/trips/{trip_id}/budget")
-def budget_summary(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def budget_summary(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip(db, trip_id)
     _require_view_access(trip, current_user.id)
 
@@ -95,7 +88,7 @@ def budget_summary(trip_id: int, db: Session = Depends(get_db), current_user=Dep
 
 
 @router.post("/trips/{trip_id}/envelopes", response_model=BudgetEnvelopeRead, status_code=status.HTTP_201_CREATED)
-def create_envelope(trip_id: int, payload: BudgetEnvelopeCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def create_envelope(trip_id: int, payload: BudgetEnvelopeCreate, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip(db, trip_id)
     _require_edit_access(trip, current_user.id)
 
@@ -104,8 +97,7 @@ def create_envelope(trip_id: int, payload: BudgetEnvelopeCreate, db: Session = D
 
     env = BudgetEnvelope(**payload.model_dump())
     db.add(env)
-    db.commit()
-    db.refresh(env)
+    db.flush()
     return env
 
 
@@ -117,7 +109,7 @@ def _get_envelope_or_404(db: Session, envelope_id: int) -> BudgetEnvelope:
 
 
 @router.patch("/envelopes/{envelope_id}", response_model=BudgetEnvelopeRead)
-def update_envelope(envelope_id: int, payload: BudgetEnvelopeUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def update_envelope(envelope_id: int, payload: BudgetEnvelopeUpdate, db: DbSession, current_user=Depends(get_current_user)):
     env = _get_envelope_or_404(db, envelope_id)
     trip = _get_trip(db, env.trip_id)
     _require_edit_access(trip, current_user.id)
@@ -130,24 +122,23 @@ def update_envelope(envelope_id: int, payload: BudgetEnvelopeUpdate, db: Session
             continue
         setattr(env, field, value)
 
-    db.commit()
-    db.refresh(env)
+    db.flush()
     return env
 
 
 @router.delete("/envelopes/{envelope_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_envelope(envelope_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_envelope(envelope_id: int, db: DbSession, current_user=Depends(get_current_user)):
     env = _get_envelope_or_404(db, envelope_id)
     trip = _get_trip(db, env.trip_id)
     _require_edit_access(trip, current_user.id)
 
     db.delete(env)
-    db.commit()
+    db.flush()
     return None
 
 
 @router.post("/trips/{trip_id}/expenses", response_model=ExpenseRead, status_code=status.HTTP_201_CREATED)
-def create_expense(trip_id: int, payload: ExpenseCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def create_expense(trip_id: int, payload: ExpenseCreate, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip(db, trip_id)
     _require_edit_access(trip, current_user.id)
 
@@ -156,8 +147,7 @@ def create_expense(trip_id: int, payload: ExpenseCreate, db: Session = Depends(g
 
     expense = Expense(**payload.model_dump())
     db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    db.flush()
     return expense
 
 
@@ -169,7 +159,7 @@ def _get_expense_or_404(db: Session, expense_id: int) -> Expense:
 
 
 @router.patch("/expenses/{expense_id}", response_model=ExpenseRead)
-def update_expense(expense_id: int, payload: ExpenseUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def update_expense(expense_id: int, payload: ExpenseUpdate, db: DbSession, current_user=Depends(get_current_user)):
     expense = _get_expense_or_404(db, expense_id)
     trip = _get_trip(db, expense.trip_id)
     _require_edit_access(trip, current_user.id)
@@ -182,17 +172,16 @@ def update_expense(expense_id: int, payload: ExpenseUpdate, db: Session = Depend
             continue
         setattr(expense, field, value)
 
-    db.commit()
-    db.refresh(expense)
+    db.flush()
     return expense
 
 
 @router.delete("/expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(expense_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_expense(expense_id: int, db: DbSession, current_user=Depends(get_current_user)):
     expense = _get_expense_or_404(db, expense_id)
     trip = _get_trip(db, expense.trip_id)
     _require_edit_access(trip, current_user.id)
 
     db.delete(expense)
-    db.commit()
+    db.flush()
     return None
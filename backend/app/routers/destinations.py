@@ -2,9 +2,9 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.db import get_db
+from app.db import DbSession
 from app.models import Trip, TripDestination, Location
 from app.routers.auth import get_current_user
 from app.schemas import LocationCreate, LocationRead, TripDestinationRead
@@ -13,31 +13,26 @@ router = APIRouter(prefix="/trips", tags=["destinations"])
 
 
 def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = db.query(Trip).options(selectinload(Trip.members)).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
     return trip
 
 
 def _require_owner_or_member(trip: Trip, user_id: int) -> None:
-    if trip.owner_id == user_id:
-        return
-    if any(m.user_id == user_id for m in trip.members):
+    if trip.role_for(user_id) is not None:
         return
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
 
 
 def _require_owner_or_editor(trip: Trip, user_id: int) -> None:
-    if trip.owner_id == user_id:
-        return
-    member = next((m for m in trip.members if m.user_id == user_id), None)
-    if member and member.role in {"owner", "editor"}:
+    if trip.role_for(user_id) in {"owner", "editor"}:
         return
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owners or editors can modify destinations")
 
 
 @router.get("/{trip_id}/destinations")
-def list_destinations(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def list_destinations(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip(db, trip_id)
     _require_owner_or_member(trip, current_user.id)
     destinations = (
@@ -62,7 +57,7 @@ def list_destinations(trip_id: int, db: Session = Depends(get_db), current_user=
 def add_destination(
     trip_id: int,
     payload: LocationCreate,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip(db, trip_id)
@@ -70,14 +65,12 @@ def add_destination(
 
     location = Location(name=payload.name, type=payload.type, address=payload.address)
     db.add(location)
-    db.commit()
-    db.refresh(location)
+    db.flush()
 
     max_order = db.query(func.coalesce(func.max(TripDestination.sort_order), 0)).filter(TripDestination.trip_id == trip_id).scalar()
     dest = TripDestination(trip_id=trip_id, location_id=location.id, sort_order=max_order + 1)
     db.add(dest)
-    db.commit()
-    db.refresh(dest)
+    db.flush()
 
     return {"destination": TripDestinationRead.model_validate(dest), "location": LocationRead.model_validate(location)}
 
@@ -87,7 +80,7 @@ def reorder_destination(
     trip_id: int,
     dest_id: int,
     direction: str,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip(db, trip_id)
@@ -117,13 +110,13 @@ def reorder_destination(
 
     if swap:
         dest.sort_order, swap.sort_order = swap.sort_order, dest.sort_order
-        db.commit()
+        db.flush()
 
     return {"status": "ok"}
 
 
 @router.delete("/{trip_id}/destinations/{dest_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_destination(trip_id: int, dest_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_destination(trip_id: int, dest_id: int, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip(db, trip_id)
     _require_owner_or_editor(trip, current_user.id)
 
@@ -131,5 +124,5 @@ def delete_destination(trip_id: int, dest_id: int, db: Session = Depends(get_db)
     if not dest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
     db.delete(dest)
-    db.commit()
+    db.flush()
     return None
@@ -4,9 +4,9 @@ from datetime import date as date_type
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
-from app.db import get_db
+from app.db import DbSession
 from app.models import Event, Trip, TripMember
 from app.routers.auth import get_current_user
 from app.schemas import EventCreate, EventRead, EventUpdate
@@ -15,21 +15,14 @@ router = APIRouter(tags=["events"])
 
 
 def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = db.query(Trip).options(selectinload(Trip.members)).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
     return trip
 
 
-def _user_role_for_trip(trip: Trip, user_id: int) -> Optional[str]:
-    if trip.owner_id == user_id:
-        return "owner"
-    membership = next((m for m in trip.members if m.user_id == user_id), None)
-    return membership.role if membership else None
-
-
 def _require_view_access(trip: Trip, user_id: int) -> str:
-    role = _user_role_for_trip(trip, user_id)
+    role = trip.role_for(user_id)
     if not role:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
     return role
@@ -44,8 +37,8 @@ def _require_edit_access(trip: Trip, user_id: int) -> None:
 @router.get("/trips/{trip_id}/events", response_model=List[EventRead])
 def list_events(
     trip_id: int,
+    db: DbSession,
     date: Optional[date_type] = Query(default=None),
-    db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip(db, trip_id)
@@ -62,7 +55,7 @@ def list_events(
 def create_event(
     trip_id: int,
     payload: EventCreate,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip(db, trip_id)
@@ -73,8 +66,7 @@ def create_event(
 
     event = Event(**payload.model_dump())
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    db.flush()
     return event
 
 
@@ -89,7 +81,7 @@ def _get_event_or_404(db: Session, event_id: int) -> Event:
 def update_event(
     event_id: int,
     payload: EventUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     event = _get_event_or_404(db, event_id)
@@ -99,17 +91,16 @@ def update_event(
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(event, field, value)
 
-    db.commit()
-    db.refresh(event)
+    db.flush()
     return event
 
 
 @router.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(event_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_event(event_id: int, db: DbSession, current_user=Depends(get_current_user)):
     event = _get_event_or_404(db, event_id)
     trip = _get_trip(db, event.trip_id)
     _require_edit_access(trip, current_user.id)
 
     db.delete(event)
-    db.commit()
+    db.flush()
     return None
@@ -1,19 +1,22 @@
 """Trip management endpoints."""
 
-from typing import List, Optional
-import io
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from pydantic import BaseModel
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session, raiseload, selectinload
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
-from app.db import get_db
-from app.models import Trip, TripMember, Event, BudgetEnvelope, Expense, WeatherAlert
+from app.config import get_settings
+from app.db import DbSession
+from app.models import Trip, TripMember, Event, Expense
 from app.routers.auth import get_current_user
 from app.schemas import (
     TripCreate,
@@ -22,25 +25,44 @@ from app.schemas import (
     TripUpdate,
 )
 
+settings = get_settings()
+
 router = APIRouter(prefix="/trips", tags=["trips"])
 
+# PDFs up to this size stay in memory; larger exports spill to a temp file.
+PDF_SPOOL_MAX_SIZE = 512 * 1024
+
+# Static layout for the PDF export, in points.
+PDF_TITLE_FONT = ("Helvetica-Bold", 16)
+PDF_SUBTITLE_FONT = ("Helvetica", 12)
+PDF_HEADING_FONT = ("Helvetica-Bold", 14)
+PDF_BODY_FONT = ("Helvetica", 11)
+PDF_TITLE_LEADING = 20
+PDF_SUBTITLE_LEADING = 15
+PDF_HEADER_GAP = 25
+PDF_HEADING_LEADING = 18
+PDF_BODY_LEADING = 14
+PDF_SECTION_GAP = 10
+PDF_MARGIN_X = 50
+PDF_BODY_X = 60
+PDF_TOP_Y = letter[1] - 50
+PDF_BOTTOM_Y = 80
+
 
 class TripMemberUpsert(BaseModel):
     user_id: int
     role: str
 
 
-def _get_trip_or_404(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+def _get_trip_or_404(db: Session, trip_id: int, *options) -> Trip:
+    trip = db.query(Trip).options(selectinload(Trip.members), *options).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
     return trip
 
 
 def _ensure_member_or_owner(trip: Trip, user_id: int) -> None:
-    is_owner = trip.owner_id == user_id
-    is_member = any(member.user_id == user_id for member in trip.members)
-    if not (is_owner or is_member):
+    if trip.role_for(user_id) is None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
 
 
@@ -50,30 +72,31 @@ def _ensure_owner(trip: Trip, user_id: int) -> None:
 
 
 @router.get("", response_model=List[TripRead])
-def list_trips(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trips = (
-        db.query(Trip)
-        .outerjoin(TripMember, TripMember.trip_id == Trip.id)
-        .filter(or_(Trip.owner_id == current_user.id, TripMember.user_id == current_user.id))
-        .distinct()
+def list_trips(db: DbSession, current_user=Depends(get_current_user)):
+    shared_trip_ids = select(TripMember.trip_id).where(TripMember.user_id == current_user.id)
+    rows = (
+        db.query(Trip.id, Trip.owner_id, Trip.name, Trip.destination, Trip.start_date, Trip.end_date)
+        .filter(or_(Trip.owner_id == current_user.id, Trip.id.in_(shared_trip_ids)))
         .all()
     )
-    return trips
+    return rows
 
 
 @router.post("", response_model=TripRead, status_code=status.HTTP_201_CREATED)
-def create_trip(payload: TripCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def create_trip(payload: TripCreate, db: DbSession, current_user=Depends(get_current_user)):
     trip_data = payload.model_dump(exclude={"owner_id"})
     trip = Trip(owner_id=current_user.id, **trip_data)
     db.add(trip)
-    db.commit()
-    db.refresh(trip)
+    db.flush()
     return trip
 
 
 @router.get("/{trip_id}", response_model=TripRead)
-def get_trip(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
+def get_trip(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
+    # In debug builds, any other relationship touched while serializing TripRead
+    # (a hidden N+1) raises instead of silently lazy-loading.
+    options = (raiseload("*"),) if settings.debug else ()
+    trip = _get_trip_or_404(db, trip_id, *options)
     _ensure_member_or_owner(trip, current_user.id)
     return trip
 
@@ -82,33 +105,36 @@ def get_trip(trip_id: int, db: Session = Depends(get_db), current_user=Depends(g
 def update_trip(
     trip_id: int,
     payload: TripUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip_or_404(db, trip_id)
     _ensure_owner(trip, current_user.id)
 
     update_data = payload.model_dump(exclude_unset=True)
+    if "destination" in update_data and update_data["destination"] != trip.destination:
+        # Stored coordinates belong to the old destination; the weather endpoint re-geocodes.
+        trip.destination_latitude = None
+        trip.destination_longitude = None
     for field, value in update_data.items():
         setattr(trip, field, value)
 
-    db.commit()
-    db.refresh(trip)
+    db.flush()
     return trip
 
 
 @router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_trip(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def delete_trip(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip_or_404(db, trip_id)
     _ensure_owner(trip, current_user.id)
 
     db.delete(trip)
-    db.commit()
+    db.flush()
     return None
 
 
 @router.get("/{trip_id}/members", response_model=List[TripMemberRead])
-def list_trip_members(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+def list_trip_members(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
     trip = _get_trip_or_404(db, trip_id)
     _ensure_member_or_owner(trip, current_user.id)
     return trip.members
@@ -118,7 +144,7 @@ def list_trip_members(trip_id: int, db: Session = Depends(get_db), current_user=
 def add_or_update_member(
     trip_id: int,
     payload: TripMemberUpsert,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip_or_404(db, trip_id)
@@ -134,8 +160,7 @@ def add_or_update_member(
     else:
         member = TripMember(trip_id=trip_id, user_id=payload.user_id, role=payload.role)
         db.add(member)
-    db.commit()
-    db.refresh(member)
+    db.flush()
     return member
 
 
@@ -143,7 +168,7 @@ def add_or_update_member(
 def delete_member(
     trip_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession,
     current_user=Depends(get_current_user),
 ):
     trip = _get_trip_or_404(db, trip_id)
@@ -157,80 +182,112 @@ def delete_member(
     if not member:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
     db.delete(member)
-    db.commit()
+    db.flush()
     return None
 
 
-@router.get("/{trip_id}/export/pdf")
-def export_trip_pdf(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_member_or_owner(trip, current_user.id)
+def _event_line(evt: Event) -> str:
+    line = f"{evt.date} - {evt.title} ({evt.type})"
+    if evt.start_time:
+        line += f" @ {evt.start_time}"
+    return line
+
+
+def _draw_section(p: canvas.Canvas, title: str, lines: Iterable[str], y: float) -> float:
+    """Draw a section heading and its body lines through text objects and return the next y position.
+
+    Fonts are set on the text object only where they change (heading -> body, and
+    again after a page break) instead of once per drawn line.
+    """
+    text = p.beginText(PDF_MARGIN_X, y)
+    text.setFont(*PDF_HEADING_FONT, leading=PDF_HEADING_LEADING)
+    text.textLine(title)
+    text.setXPos(PDF_BODY_X - PDF_MARGIN_X)
+    text.setFont(*PDF_BODY_FONT, leading=PDF_BODY_LEADING)
+    for line in lines:
+        text.textLine(line)
+        if text.getY() < PDF_BOTTOM_Y:
+            p.drawText(text)
+            p.showPage()
+            text = p.beginText(PDF_BODY_X, PDF_TOP_Y)
+            text.setFont(*PDF_BODY_FONT, leading=PDF_BODY_LEADING)
+    p.drawText(text)
+    return text.getY()
+
+
+def _get_trip_for_export(db: Session, trip_id: int) -> Trip:
+    return _get_trip_or_404(
+        db,
+        trip_id,
+        selectinload(Trip.events),
+        selectinload(Trip.budget_envelopes),
+        selectinload(Trip.weather_alerts),
+    )
+
+
+def _load_export_rows(db: Session, trip_id: int, user_id: int):
+    trip = _get_trip_for_export(db, trip_id)
+    _ensure_member_or_owner(trip, user_id)
 
-    events = (
-        db.query(Event)
-        .filter(Event.trip_id == trip_id)
-        .order_by(Event.date, Event.start_time)
+    totals = dict(
+        db.query(Expense.envelope_id, func.sum(Expense.amount))
+        .filter(Expense.trip_id == trip_id)
+        .group_by(Expense.envelope_id)
         .all()
     )
-    envelopes = db.query(BudgetEnvelope).filter(BudgetEnvelope.trip_id == trip_id).all()
-    expenses = db.query(Expense).filter(Expense.trip_id == trip_id).all()
-    alerts = db.query(WeatherAlert).filter(WeatherAlert.trip_id == trip_id).all()
+    return trip, totals
 
-    buffer = io.BytesIO()
+
+def _render_pdf(trip: Trip, totals) -> SpooledTemporaryFile:
+    buffer = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
     p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-
-    y = height - 50
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, y, f"Trip: {trip.name}")
-    y -= 20
-    p.setFont("Helvetica", 12)
-    p.drawString(50, y, f"Destination: {trip.destination}")
-    y -= 15
-    p.drawString(50, y, f"Dates: {trip.start_date} to {trip.end_date}")
-    y -= 25
-
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Events")
-    y -= 18
-    p.setFont("Helvetica", 11)
-    for evt in events:
-        line = f"{evt.date} - {evt.title} ({evt.type})"
-        if evt.start_time:
-            line += f" @ {evt.start_time}"
-        p.drawString(60, y, line)
-        y -= 14
-        if y < 80:
-            p.showPage()
-            y = height - 50
-
-    y -= 10
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Budget")
-    y -= 18
-    p.setFont("Helvetica", 11)
-    for env in envelopes:
-        actual = sum(exp.amount for exp in expenses if exp.envelope_id == env.id)
-        p.drawString(60, y, f"{env.category}: planned ${env.planned_amount:.2f} / actual ${actual:.2f}")
-        y -= 14
-        if y < 80:
-            p.showPage()
-            y = height - 50
-
-    if alerts:
-        y -= 10
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(50, y, "Weather Alerts")
-        y -= 18
-        p.setFont("Helvetica", 11)
-        for alert in alerts:
-            p.drawString(60, y, f"{alert.date} [{alert.severity}] {alert.summary}")
-            y -= 14
-            if y < 80:
-                p.showPage()
-                y = height - 50
+
+    header = p.beginText(PDF_MARGIN_X, PDF_TOP_Y)
+    header.setFont(*PDF_TITLE_FONT, leading=PDF_TITLE_LEADING)
+    header.textLine(f"Trip: {trip.name}")
+    header.setFont(*PDF_SUBTITLE_FONT, leading=PDF_SUBTITLE_LEADING)
+    header.textLine(f"Destination: {trip.destination}")
+    header.setLeading(PDF_HEADER_GAP)
+    header.textLine(f"Dates: {trip.start_date} to {trip.end_date}")
+    p.drawText(header)
+    y = header.getY()
+
+    y = _draw_section(p, "Events", (_event_line(evt) for evt in trip.events), y)
+
+    y -= PDF_SECTION_GAP
+    y = _draw_section(
+        p,
+        "Budget",
+        (
+            f"{env.category}: planned ${env.planned_amount:.2f} / actual ${float(totals.get(env.id, 0)):.2f}"
+            for env in trip.budget_envelopes
+        ),
+        y,
+    )
+
+    if trip.weather_alerts:
+        y -= PDF_SECTION_GAP
+        y = _draw_section(
+            p,
+            "Weather Alerts",
+            (f"{alert.date} [{alert.severity}] {alert.summary}" for alert in trip.weather_alerts),
+            y,
+        )
 
     p.showPage()
     p.save()
     buffer.seek(0)
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": f'attachment; filename="trip-{trip_id}.pdf"'})
+    return buffer
+
+
+@router.get("/{trip_id}/export/pdf")
+async def export_trip_pdf(trip_id: int, db: DbSession, current_user=Depends(get_current_user)):
+    # Both the DB reads and the ReportLab rendering are blocking, so keep them off the event loop.
+    trip, totals = await run_in_threadpool(_load_export_rows, db, trip_id, current_user.id)
+    buffer = await run_in_threadpool(_render_pdf, trip, totals)
+    return StreamingResponse(
+        buffer,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="trip-{trip_id}.pdf"'},
+        background=BackgroundTask(buffer.close),
+    )
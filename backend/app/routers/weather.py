@@ -1,9 +1,13 @@
 """Live weather forecast for a trip."""
 
+import httpx
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.db import get_db
+from app.db import AsyncDbSession
+from app.http_client import get_http_client
 from app.models import Trip
 from app.routers.auth import get_current_user
 from app.schemas import TripWeatherDay, TripWeatherResponse
@@ -12,36 +16,50 @@ from app.services.weather_client import geocode_city, fetch_daily_forecast
 router = APIRouter(tags=["weather"])
 
 
-def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+async def _get_trip(db: AsyncSession, trip_id: int) -> Trip:
+    result = await db.execute(select(Trip).options(selectinload(Trip.members)).where(Trip.id == trip_id))
+    trip = result.scalar_one_or_none()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return trip
 
 
-def _user_role_for_trip(trip: Trip, user_id: int):
-    if trip.owner_id == user_id:
-        return "owner"
-    membership = next((m for m in trip.members if m.user_id == user_id), None)
-    return membership.role if membership else None
-
-
 def _require_view_access(trip: Trip, user_id: int) -> None:
-    role = _user_role_for_trip(trip, user_id)
+    role = trip.role_for(user_id)
     if not role:
         raise HTTPException(status_code=403, detail="Not authorized for this trip")
 
 
 @router.get("/trips/{trip_id}/weather", response_model=TripWeatherResponse)
-async def trip_weather(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
+async def trip_weather(
+    trip_id: int,
+    db: AsyncDbSession,
+    client: httpx.AsyncClient = Depends(get_http_client),
+    current_user=Depends(get_current_user),
+):
+    trip = await _get_trip(db, trip_id)
     _require_view_access(trip, current_user.id)
 
-    coords = await geocode_city(trip.destination)
-    if not coords:
-        raise HTTPException(status_code=404, detail="Could not find location for this trip's destination")
+    if trip.destination_latitude is not None and trip.destination_longitude is not None:
+        lat, lon = trip.destination_latitude, trip.destination_longitude
+    else:
+        destination = trip.destination
+        coords = await geocode_city(client, destination)
+        if not coords:
+            raise HTTPException(status_code=404, detail="Could not find location for this trip's destination")
+        lat, lon = coords
+        # Store the coordinates so later requests skip geocoding, but only if the
+        # destination is still the one geocoded: update_trip may have changed it
+        # (and cleared the coordinates) while the lookup was in flight.
+        await db.execute(
+            update(Trip)
+            .where(Trip.id == trip.id, Trip.destination == destination)
+            .values(destination_latitude=lat, destination_longitude=lon)
+            .execution_options(synchronize_session=False)
+        )
 
-    lat, lon = coords
-    daily = await fetch_daily_forecast(lat, lon, trip.start_date, trip.end_date)
-    days = [TripWeatherDay(**d) for d in daily]
+    daily = await fetch_daily_forecast(client, lat, lon, trip.start_date, trip.end_date)
+    # The rows come from our own parser, so skip validating them while building the days.
+    # response_model still dumps and re-validates the whole response on the way out.
+    days = [TripWeatherDay.model_construct(**d) for d in daily]
     return TripWeatherResponse(city=trip.destination, start_date=trip.start_date, end_date=trip.end_date, days=days)
@@ -194,8 +194,7 @@ class TripWeatherDay(BaseModel):
     summary: str
     advice: str
 
-    class Config:
-        orm_mode = False
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
 
 class TripWeatherResponse(BaseModel):
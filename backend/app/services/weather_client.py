@@ -1,27 +1,91 @@
+import time
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from itertools import zip_longest
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
 import httpx
+import orjson
 
+GEOCODE_CACHE_TTL_SECONDS = 24 * 60 * 60
+FORECAST_CACHE_TTL_SECONDS = 30 * 60
+
+CLEAR_SUMMARY = "Clear"
+CLOUDY_SUMMARY = "Cloudy"
+RAINY_SUMMARY = "Rainy"
+CLEAR_ADVICE = "Good weather – great day for walking and outdoor plans."
+CLOUDY_ADVICE = "Chance of showers – keep an umbrella handy and have a backup indoor option."
+RAINY_ADVICE = "Heavy rain expected – plan indoor activities or rideshares."
+HOT_ADVICE = "Very hot – schedule outdoor activities early and stay hydrated."
+COLD_ADVICE = "Cold weather – bring layers and keep walks shorter."
+
+
+class _TTLCache:
+    """Small in-process cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            # Dicts keep insertion order, so the first key is the oldest entry.
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_geocode_cache = _TTLCache(ttl=GEOCODE_CACHE_TTL_SECONDS, maxsize=1024)
+_forecast_cache = _TTLCache(ttl=FORECAST_CACHE_TTL_SECONDS, maxsize=2048)
+
+
+async def geocode_city(client: httpx.AsyncClient, name: str) -> Optional[Tuple[float, float]]:
+    cache_key = name.strip().casefold()
+    cached = _geocode_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-async def geocode_city(name: str) -> Optional[Tuple[float, float]]:
     url = "https://geocoding-api.open-meteo.com/v1/search"
     params = {"name": name, "count": 1}
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            results = data.get("results") or []
-            if not results:
-                return None
-            first = results[0]
-            return float(first["latitude"]), float(first["longitude"])
-        except Exception:
+    try:
+        resp = await client.get(url, params=params)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        results = data.get("results") or []
+        if not results:
             return None
+        first = results[0]
+        coords = float(first["latitude"]), float(first["longitude"])
+    except Exception:
+        return None
+    _geocode_cache.set(cache_key, coords)
+    return coords
 
 
-async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_date: date) -> List[Dict]:
+async def fetch_daily_forecast(
+    client: httpx.AsyncClient, lat: float, lon: float, start_date: date, end_date: date
+) -> List[Dict]:
+    # Two decimal places is roughly 1 km, close enough for a daily forecast and
+    # lets nearby lookups share a cache entry.
+    lat, lon = round(lat, 2), round(lon, 2)
+    cache_key = (lat, lon, start_date.isoformat(), end_date.isoformat())
+    cached = _forecast_cache.get(cache_key)
+    if cached is not None:
+        # Hand out copies so callers can't mutate the shared cache entry.
+        return [dict(day) for day in cached]
+
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": lat,
@@ -31,37 +95,47 @@ async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_dat
         "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max",
         "timezone": "auto",
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            daily = resp.json().get("daily", {})
-        except Exception:
-            return []
+    try:
+        resp = await client.get(url, params=params)
+        resp.raise_for_status()
+        daily = orjson.loads(resp.content).get("daily", {})
+    except Exception:
+        return []
+
+    results = _parse_daily_forecast(daily)
+    if results:
+        # An empty forecast means the provider had nothing for this range; retry next time.
+        _forecast_cache.set(cache_key, [dict(day) for day in results])
+    return results
+
+
+def _classify_day(prob: float, hi: Optional[float], lo: Optional[float]) -> Tuple[str, str]:
+    if prob >= 70:
+        summary, advice = RAINY_SUMMARY, RAINY_ADVICE
+    elif prob >= 40:
+        summary, advice = CLOUDY_SUMMARY, CLOUDY_ADVICE
+    else:
+        summary, advice = CLEAR_SUMMARY, CLEAR_ADVICE
+    if lo is not None and lo <= 35:
+        advice = COLD_ADVICE
+    elif hi is not None and hi >= 32:
+        advice = HOT_ADVICE
+    return summary, advice
 
+
+def _parse_daily_forecast(daily: Dict) -> List[Dict]:
     dates = daily.get("time", [])
     tmax = daily.get("temperature_2m_max", [])
     tmin = daily.get("temperature_2m_min", [])
     precip = daily.get("precipitation_probability_max", [])
 
     results: List[Dict] = []
-    for idx, d in enumerate(dates):
-        prob = precip[idx] if idx < len(precip) else 0
-        hi = tmax[idx] if idx < len(tmax) else None
-        lo = tmin[idx] if idx < len(tmin) else None
-        summary = "Clear"
-        advice = "Good weather – great day for walking and outdoor plans."
-        if prob >= 70:
-            summary = "Rainy"
-            advice = "Heavy rain expected – plan indoor activities or rideshares."
-        elif prob >= 40:
-            summary = "Cloudy"
-            advice = "Chance of showers – keep an umbrella handy and have a backup indoor option."
-        if hi is not None and hi >= 32:
-            advice = "Very hot – schedule outdoor activities early and stay hydrated."
-        if lo is not None and lo <= 35:
-            advice = "Cold weather – bring layers and keep walks shorter."
-
+    for d, hi, lo, prob in zip_longest(dates, tmax, tmin, precip):
+        if d is None:
+            # Value arrays longer than the date axis have nothing to attach to.
+            break
+        prob = 0 if prob is None else prob
+        summary, advice = _classify_day(prob, hi, lo)
         results.append(
             {
                 "date": date.fromisoformat(d),